@@ -0,0 +1 @@
+"""Core components of the INCOME‑AI system."""
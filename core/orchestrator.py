@@ -0,0 +1,439 @@
+"""
+INCOME‑AI Orchestrator
+======================
+
+This module bootstraps a periodic orchestration loop for the INCOME‑AI
+system.  It loads environment variables from a ``.env`` file,
+instantiates a ``Memory`` database and a ``MetaAgent`` planner, and
+executes the planner at a configurable cadence using a monotonic
+deadline loop.  If the required modules are not available, simple stub
+implementations are provided so that the orchestrator can still run
+for demonstration purposes.
+
+Both ``main.py`` and ``main.upgraded.py`` are thin entry points that
+call :func:`main` from this module.
+
+Configuration
+-------------
+The following environment variables can be set to customise
+behaviour:
+
+``DB_PATH``
+    Path to the SQLite database file used by ``Memory``.  Defaults
+    to ``./data/income_ai.db``.
+
+``CHECK_INTERVAL_MIN``
+    Number of minutes between planner iterations.  Defaults to
+    ``30``.  ``0`` is treated as one minute; negative values are
+    rejected at startup.
+
+``LOG_FILE``
+    File to write orchestrator logs to.  Logs go to stderr when unset.
+
+The environment variables are loaded from a ``.env`` file in the
+current directory if present via ``python‑dotenv``.
+
+Graceful shutdown is supported via ``Ctrl+C``.
+"""
+
+from __future__ import annotations
+import os
+import sys
+import time
+import select
+import signal
+import selectors
+import logging
+import subprocess
+import threading
+import functools
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Optional, Dict, Mapping, Tuple, Union
+
+_LOG = logging.getLogger("income_ai.orchestrator")
+_LOG_FORMATTER = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+_log_info, _log_warn = _LOG.info, _LOG.warning
+
+# --------------------------------------------------------------------------- #
+#  Optional self‑improving prompt execution
+PROMPT_TIMEOUT_S = 120
+_READ_CHUNK = 65536
+PROMPT_PATH = Path.cwd() / "self_improving_prompt.py"
+
+@functools.lru_cache(maxsize=1)
+def _child_env() -> Dict[str, str]:
+    """
+    Environment for prompt runs, built on first use.  Later changes to
+    ``os.environ`` are not seen by the child; call ``_child_env.cache_clear()``
+    to rebuild it.
+    """
+    env = dict(os.environ)
+    env.setdefault("MAX_ITERATIONS", "1")
+    return env
+
+def run_self_improving_prompt_once(prompt_script_path: Union[str, Path], user_seed: Optional[str] = None) -> Optional[subprocess.Popen]:
+    """
+    Execute a single iteration of a self‑improving prompt loop.  This helper
+    allows the orchestrator to call an external prompt script non‑interactively.
+
+    The external script is expected to honour the ``MAX_ITERATIONS`` environment
+    variable and exit after one iteration when it is set to ``1``.  A seed
+    prompt may be provided via standard input to prime the prompt.
+
+    The script is started without waiting for it to finish; the returned
+    process must be collected later with ``reap_prompt_runs``.
+    """
+    if not Path(prompt_script_path).is_file():
+        return None
+    seed = (user_seed or "Calibrate on: produce a 3–5 step plan to improve orchestrator reliability.")
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, prompt_script_path],
+            bufsize=0,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=_child_env(),
+            start_new_session=True,  # keep Ctrl+C on the orchestrator from reaching the child
+        )
+    except Exception as e:
+        _log_warn("Self-improving prompt run failed: %s", e)
+        return None
+    data = memoryview((seed + "\nexit\n").encode())
+    try:
+        while data:
+            data = data[proc.stdin.write(data):]
+    except BrokenPipeError:
+        pass  # The child exited early; reap_prompt_runs() will log its output.
+    finally:
+        proc.stdin.close()
+    return proc
+
+@dataclass
+class PromptRun:
+    """Deadline and output collected so far for a running prompt script."""
+    deadline: float
+    stdout: bytearray = field(default_factory=bytearray)
+    stderr: bytearray = field(default_factory=bytearray)
+
+def _close_pipe(f, sel: Optional[selectors.BaseSelector]) -> None:
+    """Close one of a run's output pipes, unregistering it from ``sel`` first."""
+    if f.closed:
+        return
+    if sel is not None:
+        try:
+            sel.unregister(f)
+        except KeyError:
+            pass
+    f.close()
+
+def _watch_run(sel: selectors.BaseSelector, proc: subprocess.Popen, run: PromptRun) -> None:
+    """Register a run's output pipes so the main loop drains them as data arrives."""
+    sel.register(proc.stdout, selectors.EVENT_READ, run.stdout)
+    sel.register(proc.stderr, selectors.EVENT_READ, run.stderr)
+
+def _read_pipe(sel: selectors.BaseSelector, key: selectors.SelectorKey) -> None:
+    """Append what is available on a watched output pipe to its run's buffer."""
+    chunk = os.read(key.fd, _READ_CHUNK)
+    if chunk:
+        key.data.extend(chunk)
+    else:
+        _close_pipe(key.fileobj, sel)
+
+def _drain(proc: subprocess.Popen, run: PromptRun, sel: Optional[selectors.BaseSelector] = None) -> None:
+    """Read whatever output ``proc`` has produced without blocking."""
+    pending = {f: buf for f, buf in ((proc.stdout, run.stdout), (proc.stderr, run.stderr)) if not f.closed}
+    while pending:
+        ready, _, _ = select.select(list(pending), [], [], 0)
+        if not ready:
+            return
+        for f in ready:
+            chunk = os.read(f.fileno(), _READ_CHUNK)
+            if chunk:
+                pending[f] += chunk
+            else:
+                _close_pipe(f, sel)
+                del pending[f]
+
+def _signal_group(proc: subprocess.Popen, sig: int) -> None:
+    """Send ``sig`` to the process group led by ``proc``."""
+    try:
+        os.killpg(proc.pid, sig)
+    except ProcessLookupError:
+        pass  # the whole group has already exited
+
+def reap_prompt_runs(runs: Dict[subprocess.Popen, PromptRun], shutdown: bool = False,
+                     sel: Optional[selectors.BaseSelector] = None) -> None:
+    """
+    Drain output from self‑improving prompt runs and log it once they
+    finish.  Runs that have passed their deadline, or every run when
+    ``shutdown`` is true, are terminated first.  Each run leads its own
+    process group, so the whole group gets SIGTERM and, after a grace period
+    of up to one second, SIGKILL, so grandchildren can't outlive it holding
+    the output pipes.  Pipes registered with ``sel`` by the main loop are
+    unregistered before they are closed.
+    """
+    now = time.monotonic()
+    for proc, run in list(runs.items()):
+        _drain(proc, run, sel)
+        if proc.poll() is None and proc.stdout.closed and proc.stderr.closed:
+            # Both pipes hit EOF, so the child is exiting; give it a moment.
+            try:
+                proc.wait(timeout=0.1)
+            except subprocess.TimeoutExpired:
+                pass
+        if proc.poll() is None:
+            if not shutdown and now < run.deadline:
+                continue
+            if not shutdown:
+                _log_warn("Self-improving prompt timed out after %ss", PROMPT_TIMEOUT_S)
+            _signal_group(proc, signal.SIGTERM)
+            try:
+                proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+            # Even if the leader has exited, members ignoring SIGTERM may remain.
+            _signal_group(proc, signal.SIGKILL)
+            proc.wait()
+        _drain(proc, run, sel)
+        _close_pipe(proc.stdout, sel)
+        _close_pipe(proc.stderr, sel)
+        del runs[proc]
+        if _LOG.isEnabledFor(logging.INFO):
+            _log_info("[SelfImproving] stdout:\n%s", run.stdout.decode(errors="replace"))
+        if run.stderr:
+            _log_warn("[SelfImproving] stderr:\n%s", run.stderr.decode(errors="replace"))
+
+# --------------------------------------------------------------------------- #
+#  Fallback stubs when real modules are unavailable
+try:
+    from core.semantic_memory import Memory  # type: ignore
+except Exception:
+    class Memory:  # type: ignore
+        """Fallback memory stub that logs to stdout."""
+        def __init__(self, db_path: str) -> None:
+            self.db_path = db_path
+        def log(self, level: str, message: str) -> None:
+            print(f"[{level}] {message}")
+
+try:
+    from core.planner import MetaAgent  # type: ignore
+except Exception:
+    class MetaAgent:  # type: ignore
+        """Fallback planner stub that demonstrates scheduling."""
+        def __init__(self, mem: Memory) -> None:
+            self.mem = mem
+        def loop_once(self) -> None:
+            self.mem.log("DEBUG", "Running MetaAgent.loop_once (fallback)")
+
+@dataclass
+class Config:
+    db_path: str = "./data/income_ai.db"
+    interval_min: int = 30
+    auto_process_all: bool = False
+    enable_llm: bool = False
+    approvals_enforced: bool = True
+    self_improve_each_loop: bool = False
+    interval_sec: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        if self.interval_min < 0:
+            raise ValueError(f"CHECK_INTERVAL_MIN must not be negative (got {self.interval_min})")
+        self.interval_sec = max(1, int(self.interval_min)) * 60
+
+_KEYS = (
+    "DB_PATH",
+    "CHECK_INTERVAL_MIN",
+    "AUTO_PROCESS_ALL",
+    "ENABLE_LLM",
+    "USE_REAL_OPENAI",
+    "ENFORCE_APPROVALS",
+    "SELF_IMPROVE_EACH_LOOP",
+    "LOG_FILE",
+)
+
+@functools.lru_cache(maxsize=1)
+def _env_snapshot() -> Mapping[str, Optional[str]]:
+    """
+    Load the ``.env`` file once and return a read-only snapshot of the
+    variables used by the orchestrator.  Call ``_env_snapshot.cache_clear()``
+    to force the environment to be re-read.
+    """
+    from dotenv import load_dotenv  # only needed for this one-time load
+    load_dotenv()
+    get = os.environ.get
+    return MappingProxyType({k: get(k) for k in _KEYS})
+
+_TRUE = frozenset({"1", "true", "yes", "on"})
+_FALSE = frozenset({"0", "false", "no", "off"})
+
+def _envbool(name: str, default: bool) -> bool:
+    """
+    Interpret an environment variable as a boolean.  ``1``, ``true``,
+    ``yes`` and ``on`` (case-insensitive) are true; ``0``, ``false``,
+    ``no`` and ``off`` are false.  ``default`` is returned when the
+    variable is unset, and also, with a warning, for any other value so
+    that a typo never silently flips a flag.
+    """
+    value = _env_snapshot()[name]
+    if value is None:
+        return default
+    folded = value.strip().casefold()
+    if folded in _TRUE:
+        return True
+    if folded in _FALSE:
+        return False
+    _log_warn("Unrecognised value %r for %s; using default %s", value, name, default)
+    return default
+
+def load_config() -> 'Config':
+    """
+    Load runtime configuration from environment variables.  Values are read
+    from the process environment; see the documentation at the top of this
+    module for supported variables.
+    """
+    env = _env_snapshot()
+    return Config(
+        db_path=env["DB_PATH"] or "./data/income_ai.db",
+        interval_min=int(env["CHECK_INTERVAL_MIN"] or "30"),
+        auto_process_all=_envbool("AUTO_PROCESS_ALL", False),
+        enable_llm=_envbool("ENABLE_LLM", False) or _envbool("USE_REAL_OPENAI", False),
+        approvals_enforced=_envbool("ENFORCE_APPROVALS", True),
+        self_improve_each_loop=_envbool("SELF_IMPROVE_EACH_LOOP", False),
+    )
+
+def setup_logging() -> logging.Logger:
+    """
+    Configure the orchestrator logger.  Logs will be written to a file
+    specified via ``LOG_FILE`` if present, otherwise to stderr.  This
+    function is idempotent and will only add handlers on the first call.
+    """
+    logger = _LOG
+    if logger.handlers:
+        return logger
+    logger.setLevel(logging.INFO)
+    log_file = _env_snapshot()["LOG_FILE"]
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        fh = logging.FileHandler(log_file)
+        fh.setFormatter(_LOG_FORMATTER)
+        logger.addHandler(fh)
+    else:
+        ch = logging.StreamHandler()
+        ch.setFormatter(_LOG_FORMATTER)
+        logger.addHandler(ch)
+    # Records are fully handled here; don't format them again at the root.
+    logger.propagate = False
+    return logger
+
+def graceful_killer(logger: logging.Logger) -> threading.Event:
+    """
+    Install signal handlers for SIGINT and SIGTERM to allow graceful shutdown.
+    Returns a ``threading.Event`` which is set when a signal is received.
+    """
+    stop = threading.Event()
+    info = logger.info
+    def _handler(signum, frame):
+        info("Signal %s received, shutting down...", signum)
+        stop.set()
+    signal.signal(signal.SIGINT, _handler)
+    signal.signal(signal.SIGTERM, _handler)
+    return stop
+
+def _wakeup_selector() -> Tuple[selectors.BaseSelector, int, int, int]:
+    """
+    Route signal wakeups through a non-blocking pipe.  Returns a selector
+    watching the read end, both ends of the pipe, and the previously
+    installed wakeup fd, which the caller must restore when done.
+    """
+    r, w = os.pipe()
+    os.set_blocking(r, False)
+    os.set_blocking(w, False)
+    old_wakeup_fd = signal.set_wakeup_fd(w)
+    sel = selectors.DefaultSelector()
+    sel.register(r, selectors.EVENT_READ)
+    return sel, r, w, old_wakeup_fd
+
+def _run_loop_once(meta: MetaAgent, mem: Memory, cfg: Config, logger: logging.Logger,
+                   runs: Dict[subprocess.Popen, PromptRun], sel: selectors.BaseSelector) -> None:
+    """
+    Execute a single planner iteration with error handling and optional
+    self‑improvement.
+    """
+    try:
+        reap_prompt_runs(runs, sel=sel)
+        meta.loop_once()
+        if cfg.self_improve_each_loop and runs:
+            logger.info("Previous self-improving prompt run still active; not starting another")
+        elif cfg.self_improve_each_loop:
+            proc = run_self_improving_prompt_once(PROMPT_PATH)
+            if proc is not None:
+                run = runs[proc] = PromptRun(deadline=time.monotonic() + PROMPT_TIMEOUT_S)
+                _watch_run(sel, proc, run)
+    except Exception as exc:
+        mem.log("ERROR", f"Loop error: {exc}")
+        logger.exception("Planner loop error")
+
+def main(config_overrides: Optional[Mapping[str, Any]] = None) -> None:
+    """
+    Entry point for the orchestrator.  Loads configuration, initialises
+    dependencies and enters a scheduling loop.  ``config_overrides`` may
+    replace individual ``Config`` fields after they are read from the
+    environment.
+    """
+    # Logging first, so warnings raised while parsing the config reach LOG_FILE.
+    logger = setup_logging()
+    cfg = load_config()
+    if config_overrides:
+        cfg = replace(cfg, **config_overrides)
+
+    mem = Memory(db_path=cfg.db_path)
+    meta = MetaAgent(mem)
+    logger.info("INCOME-AI orchestrator starting (interval=%ss, LLM=%s, approvals=%s, self_improve=%s)",
+                cfg.interval_sec, cfg.enable_llm, cfg.approvals_enforced, cfg.self_improve_each_loop)
+    period = cfg.interval_sec
+    next_fire = time.monotonic() + period
+    runs: Dict[subprocess.Popen, PromptRun] = {}
+
+    stop = graceful_killer(logger)
+    sel, wake_r, wake_w, old_wakeup_fd = _wakeup_selector()
+    tick = functools.partial(_run_loop_once, meta, mem, cfg, logger, runs, sel)
+    logger.info("Running. Press Ctrl+C to exit.")
+    try:
+        while not stop.is_set():
+            wake_at = next_fire
+            if runs:
+                # Wake for prompt deadlines too, so timeouts are enforced on time.
+                wake_at = min(wake_at, min(run.deadline for run in runs.values()))
+            for key, _ in sel.select(timeout=max(0.0, wake_at - time.monotonic())):
+                if key.data is None:
+                    # A signal arrived; its handler has already run.
+                    try:
+                        while os.read(wake_r, 512):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    _read_pipe(sel, key)
+            if runs:
+                reap_prompt_runs(runs, sel=sel)
+            if stop.is_set() or time.monotonic() < next_fire:
+                continue
+            tick()
+            next_fire += period
+            now = time.monotonic()
+            if next_fire < now:
+                # Fell behind (slow iteration or suspend); skip missed ticks.
+                next_fire = now + period
+    finally:
+        reap_prompt_runs(runs, shutdown=True, sel=sel)
+        signal.set_wakeup_fd(old_wakeup_fd)
+        sel.close()
+        os.close(wake_r)
+        os.close(wake_w)
+        mem.log("INFO", "Orchestrator stopped. Goodbye.")
+        logger.info("Stopped.")